@@ -10,7 +10,7 @@ def main():
     para_output_file = "PARA_LEVEL.xlsx"
     word_output_file = "WORD_LEVEL.xlsx"
     annotated_pdf_folder = "Errors_Highlighted"
-    annotation_results_file = "Annotation_Results.xlsx"
+    annotation_results_file = "Annotation_Results.parquet"
     
     # Create output directory if it doesn't exist
     os.makedirs(annotated_pdf_folder, exist_ok=True)
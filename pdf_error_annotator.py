@@ -1,9 +1,434 @@
 import os
 import re
+import json
+import numpy as np
 import pandas as pd
 import fitz
 import ast
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Brackets dropped from "[x0, y0, x1, y1]" cells before parsing the numbers
+BBOX_BRACKETS = str.maketrans("", "", "[]()")
+
+
+def parse_bbox_column(values):
+    """
+    Parse a column of bounding boxes into an (N, 4) float array.
+
+    Args:
+        values: Cells holding "[x0, y0, x1, y1]" strings, lists or tuples
+
+    Returns:
+        ndarray: One row per cell, NaN rows for cells that are not a bbox
+    """
+    # Fastest path: every cell is a string of four numbers, all converted by NumPy in one call
+    if all(isinstance(v, str) and v.count(",") == 3 for v in values):
+        try:
+            numbers = ",".join(values).translate(BBOX_BRACKETS).split(",")
+            return np.array(numbers, dtype=np.float64).reshape(-1, 4)
+        except ValueError:
+            pass
+
+    # Fast path: every cell is a JSON style "[x0, y0, x1, y1]" string or already a list
+    try:
+        bboxes = np.array([json_loads(v) if isinstance(v, str) else v for v in values], dtype=np.float64)
+        if bboxes.ndim == 2 and bboxes.shape[1] == 4:
+            return bboxes
+    except (ValueError, TypeError):
+        pass
+
+    # Slow path: single quotes, tuples or missing cells (left as NaN rows)
+    bboxes = np.full((len(values), 4), np.nan)
+    for i, val in enumerate(values):
+        if isinstance(val, str):
+            try:
+                val = json.loads(val.replace("'", '"'))
+            except ValueError:
+                val = PDFErrorAnnotator.safe_literal_eval(val)
+        if isinstance(val, (list, tuple, np.ndarray)) and len(val) == 4:
+            bboxes[i] = val
+    return bboxes
+
+def parse_literal_column(values):
+    """
+    Parse a column of JSON style literals such as "[3, 1]".
+
+    Args:
+        values: Cells to parse
+
+    Returns:
+        list: Parsed cells, cells that are not valid JSON go through safe_literal_eval
+    """
+    parsed = []
+    for val in values:
+        if isinstance(val, str):
+            try:
+                val = json_loads(val)
+            except ValueError:
+                val = PDFErrorAnnotator.safe_literal_eval(val)
+        parsed.append(val)
+    return parsed
+
+def is_fresh(cache_path, source_path):
+    """True if cache_path exists and is not older than source_path."""
+    return os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(source_path)
+
+def bbox_part_columns(bbox_column):
+    """Names of the four float columns a bbox column is split into."""
+    return [f"{bbox_column} {part}" for part in ("x0", "y0", "x1", "y1")]
+
+def split_bbox_column(df, bbox_column, bboxes):
+    """Copy of df with bbox_column replaced, in place, by four float columns holding bboxes."""
+    split = df.drop(columns=bbox_column)
+    position = df.columns.get_loc(bbox_column)
+    for k, part in enumerate(bbox_part_columns(bbox_column)):
+        split.insert(position + k, part, bboxes[:, k])
+    return split
+
+def merge_bbox_columns(df, bbox_column):
+    """Copy of df with the four float columns of bbox_column joined back, in place, into one list per row."""
+    bbox_parts = bbox_part_columns(bbox_column)
+    position = df.columns.get_loc(bbox_parts[0])
+    bboxes = df[bbox_parts].to_numpy(dtype=np.float64)
+    merged = df.drop(columns=bbox_parts)
+    merged.insert(position, bbox_column, bboxes.tolist())
+    return merged
+
+def read_table(xlsx_path, bbox_column, text_columns=(), split_bbox=False):
+    """
+    Read an Excel sheet through a Parquet copy kept next to it.
+
+    The copy is rebuilt whenever the workbook is newer and stores the bbox column as
+    four float columns, so reading it back needs no per-cell parsing.
+    Without pyarrow, or when the frame can't be stored as Parquet, a CSV copy is used instead.
+
+    Args:
+        xlsx_path (str): Path to the Excel file
+        bbox_column (str): Column holding bounding boxes
+        text_columns: Columns to store as strings
+        split_bbox (bool): Return the bbox column as its four float columns
+            instead of one list per row
+
+    Returns:
+        DataFrame: Contents of the sheet
+    """
+    parquet_path = os.path.splitext(xlsx_path)[0] + ".parquet"
+    csv_path = os.path.splitext(xlsx_path)[0] + ".csv"
+    if pyarrow is not None and is_fresh(parquet_path, xlsx_path):
+        try:
+            df = pd.read_parquet(parquet_path, engine="pyarrow")
+            # The copy may have been written for another bbox column of the same
+            # workbook. That column is joined back so the frame has the sheet's
+            # columns, and this one is still text and parsed here or by the caller.
+            split_columns = [
+                column for column in (c[:-len(" x0")] for c in df.columns if c.endswith(" x0"))
+                if all(part in df.columns for part in bbox_part_columns(column))
+            ]
+            for column in split_columns:
+                if column != bbox_column or not split_bbox:
+                    df = merge_bbox_columns(df, column)
+            if split_bbox and bbox_column not in split_columns:
+                df = split_bbox_column(df, bbox_column, parse_bbox_column(df[bbox_column].to_numpy()))
+            return df
+        except Exception as e:
+            print(f"Error reading cache {parquet_path}: {e}")
+
+    if is_fresh(csv_path, xlsx_path):
+        try:
+            # CSV stores bboxes as "[x0, y0, x1, y1]" text, so they are parsed again
+            df = pd.read_csv(
+                csv_path, dtype={column: str for column in text_columns},
+                engine="pyarrow" if pyarrow is not None else "c"
+            )
+            bboxes = parse_bbox_column(df[bbox_column].to_numpy())
+            for column in text_columns:
+                df[column] = df[column].astype(str)
+            if split_bbox:
+                return split_bbox_column(df, bbox_column, bboxes)
+            df[bbox_column] = bboxes.tolist()
+            return df
+        except Exception as e:
+            print(f"Error reading cache {csv_path}: {e}")
+
+    # calamine parses xlsx in Rust, several times faster than openpyxl
+    df = pd.read_excel(xlsx_path, engine="calamine" if python_calamine is not None else None)
+    bboxes = parse_bbox_column(df[bbox_column].to_numpy())
+    df[bbox_column] = bboxes.tolist()
+    for column in text_columns:
+        df[column] = df[column].astype(str)
+    split = split_bbox_column(df, bbox_column, bboxes)
+
+    if pyarrow is not None:
+        try:
+            split.to_parquet(parquet_path, engine="pyarrow", index=False)
+            return split if split_bbox else df
+        except Exception as e:
+            print(f"Error caching {xlsx_path} as Parquet: {e}")
+
+    try:
+        df.to_csv(csv_path, index=False)
+    except Exception as e:
+        print(f"Error caching {xlsx_path} as CSV: {e}")
+    return split if split_bbox else df
+
+def within_mask(bboxes, container):
+    """Vectorized containment test of an (N, 4) bbox array against one box."""
+    if within_mask_kernel is not None:
+        return within_mask_kernel(bboxes, container)
+    # Two packed compares of the (x0, y0) and (x1, y1) halves, each reduced across its row
+    return (bboxes[:, :2] >= container[:2]).all(axis=1) & (bboxes[:, 2:] <= container[2:]).all(axis=1)
+
+def word_offsets(contents):
+    """Start and end offsets of each word in " ".join(contents)."""
+    lens = np.fromiter(map(len, contents), dtype=np.int64, count=len(contents))
+    starts = np.zeros(len(contents), dtype=np.int64)
+    np.cumsum(lens[:-1] + 1, out=starts[1:])
+    return starts, starts + lens
+
+def paragraph_text(page_text, starts, ends, indices):
+    """
+    " ".join of the words at sorted page indices, with each word's start and end in it.
+
+    Args:
+        page_text (str): " ".join of all words on the page
+        starts: Start offset of each page word in page_text
+        ends: End offset of each page word in page_text
+        indices: Sorted indices of the paragraph's words
+
+    Returns:
+        tuple: (text, word starts, word ends)
+    """
+    first, last = indices[0], indices[-1]
+    if last - first + 1 == len(indices):
+        # Paragraph words are usually one run of the page, sliced out without a join
+        offset = starts[first]
+        return page_text[offset:ends[last]], starts[first:last + 1] - offset, ends[first:last + 1] - offset
+    contents = [page_text[a:b] for a, b in zip(starts[indices].tolist(), ends[indices].tolist())]
+    word_starts, word_ends = word_offsets(contents)
+    return " ".join(contents), word_starts, word_ends
+
+def line_rects(phrase_bboxes, line_tolerance):
+    """
+    Merge word bboxes into one [x0, y0, x1, y1] rect per text line.
+
+    Boxes are sorted by top y and a new line starts where the gap exceeds the tolerance.
+    """
+    boxes = np.asarray(phrase_bboxes, dtype=np.float64)
+    boxes = boxes[np.argsort(boxes[:, 1], kind="stable")]
+    if line_starts_kernel is not None:
+        line_starts = line_starts_kernel(boxes[:, 1], line_tolerance)
+    else:
+        line_starts = np.flatnonzero(np.r_[True, np.abs(np.diff(boxes[:, 1])) > line_tolerance])
+    mins = np.minimum.reduceat(boxes[:, :2], line_starts)
+    maxs = np.maximum.reduceat(boxes[:, 2:], line_starts)
+    return np.hstack([mins, maxs]).tolist()
+
+@lru_cache(maxsize=1024)
+def phrase_matcher(phrases):
+    """
+    Build the matcher for a sorted tuple of phrases, cached since paragraphs
+    often share the same error list.
+
+    Returns:
+        tuple: (Aho-Corasick automaton or compiled regex, phrases to look up with str.find)
+    """
+    # A regex reports one phrase per position, so a phrase that is a prefix of
+    # another could be hidden by it and is looked up on its own instead
+    prefixes = tuple(p for p in phrases if any(q != p and q.startswith(p) for q in phrases))
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for phrase in phrases:
+            automaton.add_word(phrase, phrase)
+        automaton.make_automaton()
+        return automaton, ()
+
+    # Lookahead so overlapping occurrences are all reported
+    alternatives = [re.escape(p) for p in phrases if p not in prefixes]
+    return re.compile("(?=(" + "|".join(alternatives) + "))"), prefixes
+
+def first_occurrences(text, phrases):
+    """Start of the first occurrence of each phrase in text, -1 if absent."""
+    phrases = {p for p in phrases if isinstance(p, str) and p}
+    if len(phrases) < 2:
+        return {p: text.find(p) for p in phrases}
+
+    # One pass over text for all phrases instead of one scan per phrase
+    matcher, prefixes = phrase_matcher(tuple(sorted(phrases)))
+    positions = {p: text.find(p) for p in prefixes}
+    if ahocorasick is not None:
+        matches = ((end - len(phrase) + 1, phrase) for end, phrase in matcher.iter(text))
+    else:
+        matches = ((m.start(), m.group(1)) for m in matcher.finditer(text))
+
+    remaining = len(phrases) - len(prefixes)
+    for start, phrase in matches:
+        if phrase not in positions:
+            positions[phrase] = start
+            remaining -= 1
+            if not remaining:
+                break
+    for phrase in phrases:
+        positions.setdefault(phrase, -1)
+    return positions
+
+def phrase_starts(text, phrase):
+    """Sorted start of every occurrence of phrase in text, overlapping ones included."""
+    starts = []
+    start = text.find(phrase)
+    while start != -1:
+        starts.append(start)
+        start = text.find(phrase, start + 1)
+    return np.array(starts, dtype=np.int64)
+
+def find_partial_runs(contents_nospace, spans, next_spans, clean_error, used_indices):
+    """
+    Greedy scan for runs of words (within one span chain) whose text with
+    spaces removed is a prefix of clean_error. contents_nospace holds the
+    words with spaces already removed.
+
+    Returns:
+        list: Word indices of each run, in order
+    """
+    runs = []
+    i = 0
+
+    while i < len(contents_nospace):
+        if i in used_indices:
+            i += 1
+            continue
+
+        built = contents_nospace[i]
+        if not clean_error.startswith(built):
+            i += 1
+            continue
+
+        # Length of clean_error matched so far: each next word only has to
+        # match at that offset, the prefix before it is already known to match
+        matched = len(built)
+        j = i + 1
+
+        while j < len(contents_nospace):
+            if next_spans[j - 1] != spans[j]:
+                break
+
+            next_content = contents_nospace[j]
+
+            if clean_error.startswith(next_content, matched):
+                matched += len(next_content)
+                j += 1
+            else:
+                break
+
+        if matched > 0:
+            runs.append(list(range(i, j)))
+            i = j
+        else:
+            i += 1
+
+    return runs
+
+def _partial_runs_kernel(word_buf, byte_offsets, span_breaks, used_mask, target):
+    # Same scan as find_partial_runs over UTF-8 bytes: word k is
+    # word_buf[byte_offsets[k]:byte_offsets[k + 1]]. Returns run bounds [start, end).
+    n_words = len(byte_offsets) - 1
+    run_starts = np.empty(n_words, np.int64)
+    run_ends = np.empty(n_words, np.int64)
+    n_runs = 0
+    i = 0
+
+    while i < n_words:
+        if used_mask[i]:
+            i += 1
+            continue
+
+        matched = 0
+        j = i
+        while j < n_words and (j == i or not span_breaks[j]):
+            word_len = byte_offsets[j + 1] - byte_offsets[j]
+            if matched + word_len > len(target):
+                break
+            is_prefix = True
+            for k in range(word_len):
+                if word_buf[byte_offsets[j] + k] != target[matched + k]:
+                    is_prefix = False
+                    break
+            if not is_prefix:
+                break
+            matched += word_len
+            j += 1
+
+        if j > i and matched > 0:
+            run_starts[n_runs] = i
+            run_ends[n_runs] = j
+            n_runs += 1
+            i = j
+        else:
+            i += 1
+
+    return run_starts[:n_runs], run_ends[:n_runs]
+
+def _within_mask_kernel(bboxes, container):
+    # Loop form of within_mask, one pass over the boxes without temporaries
+    mask = np.empty(len(bboxes), np.bool_)
+    for i in range(len(bboxes)):
+        mask[i] = (
+            bboxes[i, 0] >= container[0] and bboxes[i, 2] <= container[2] and
+            bboxes[i, 1] >= container[1] and bboxes[i, 3] <= container[3]
+        )
+    return mask
+
+def _line_starts_kernel(y, line_tolerance):
+    # Positions in the sorted top y values where a new text line starts
+    starts = np.empty(len(y), np.int64)
+    n_starts = 0
+    for i in range(len(y)):
+        if i == 0 or abs(y[i] - y[i - 1]) > line_tolerance:
+            starts[n_starts] = i
+            n_starts += 1
+    return starts[:n_starts]
+
+# No fastmath: NaN boxes must compare false exactly as in the NumPy versions
+partial_runs_kernel = njit(cache=True)(_partial_runs_kernel) if njit is not None else None
+within_mask_kernel = njit(cache=True)(_within_mask_kernel) if njit is not None else None
+line_starts_kernel = njit(cache=True)(_line_starts_kernel) if njit is not None else None
+
+def _annotate_file(annotator, filename, folder_path, output_folder):
+    """
+    Worker entry point used by PDFErrorAnnotator.process_all_files.
+    
+    Returns:
+        Series: Annotation_bbox column of the single-file annotator's results
+    """
+    annotator.process_file(filename, folder_path, output_folder)
+    return annotator.df_results["Annotation_bbox"]
 
 class PDFErrorAnnotator:
     """
@@ -14,19 +439,40 @@ class PDFErrorAnnotator:
     EXACT_MATCH_COLOR = (1, 1, 0)       # Yellow for exact matches
     POTENTIAL_ERROR_COLOR = (1, 0.7, 0.7)  # Light red for potential errors
     
-    def __init__(self, buffer=5, line_tolerance=2):
+    # Most (page, error phrase) occurrence lists kept by each annotator
+    PHRASE_CACHE_SIZE = 10000
+    
+    def __init__(self, buffer=5, line_tolerance=2, bbox_column="Clipbounds",
+                 para_file_column="Asset Name", strict=False, highlight_empty_paragraphs=True):
         """
         Initialize the PDF Error Annotator.
         
         Args:
             buffer (int): Buffer to extend paragraph boundaries
             line_tolerance (int): Tolerance for considering words on the same line
+            bbox_column (str): Column holding paragraph and word bounding boxes
+            para_file_column (str): Paragraph column holding the PDF file name
+            strict (bool): Fall back to partial word matches instead of highlighting
+                the whole paragraph when an error phrase is not found
+            highlight_empty_paragraphs (bool): Without strict, highlight the whole paragraph
+                when no words lie inside its bbox, instead of leaving it unannotated
         """
         self.BUFFER = buffer
         self.LINE_TOLERANCE = line_tolerance
+        self.BUFFER_OFFSETS = np.array([-buffer, -buffer, buffer, buffer])
+        self.bbox_column = bbox_column
+        self.para_file_column = para_file_column
+        self.strict = strict
+        self.highlight_empty_paragraphs = highlight_empty_paragraphs
         self.df_para = None
         self.df_words = None
         self.df_results = None
+        self.para_bboxes = None  # (N, 4) paragraph bboxes, row aligned with df_para
+        # file name -> page number -> (word bboxes, y order, sorted y, page text, word starts, word ends,
+        # contents, spans, next word spans), span lists only in strict mode
+        self.page_words = {}
+        # (file name, page number, error phrase) -> sorted starts of the phrase in the page text
+        self.phrase_cache = OrderedDict()
     
     def load_data(self, para_file, word_file):
         """
@@ -37,15 +483,34 @@ class PDFErrorAnnotator:
             word_file (str): Path to word level Excel file
         """
         # Load paragraph data
-        self.df_para = pd.read_excel(para_file)
-        self.df_para["Clipbounds"] = self.df_para["Clipbounds"].apply(self.safe_literal_eval)
-        self.df_para["Clipbounds"] = self.df_para["Clipbounds"].apply(
-            lambda x: [x[0], x[3], x[2], x[1]] if x else None
-        )  # Convert to correct format
+        self.df_para = read_table(para_file, self.bbox_column)
+        self.para_bboxes = parse_bbox_column(self.df_para[self.bbox_column].to_numpy())
+        self.para_bboxes = self.para_bboxes[:, [0, 3, 2, 1]]  # Convert to correct format
+        self.df_para[self.bbox_column] = self.para_bboxes.tolist()
+        
+        # Load word data, keeping bboxes as four float columns instead of a list per row
+        self.df_words = read_table(word_file, self.bbox_column, text_columns=["Content"], split_bbox=True)
+        word_bboxes = self.df_words[bbox_part_columns(self.bbox_column)].to_numpy(dtype=np.float64)
+        if self.strict:
+            # Span chains are only needed for partial matching
+            self.df_words["Spans"] = parse_literal_column(self.df_words["Spans"])
+            self.df_words["Next Word Span"] = parse_literal_column(self.df_words["Next Word Span"])
         
-        # Load word data
-        self.df_words = pd.read_excel(word_file)
-        self.df_words["Clipbounds"] = self.df_words["Clipbounds"].apply(self.safe_literal_eval)
+        # Index words by file and page once instead of filtering df_words per paragraph.
+        # Each page also keeps its word order by top y for range lookups, its words
+        # joined once so paragraphs slice their text out of it, and its word columns
+        # as lists that paragraphs index instead of slicing df_words.
+        self.page_words = {}
+        for (filename, page_number), group in self.df_words.groupby(["File Name", "Page Number"], sort=False):
+            page_bboxes = word_bboxes[group.index.to_numpy()]
+            y_order = np.argsort(page_bboxes[:, 1], kind="stable")
+            contents = group["Content"].tolist()
+            spans = group["Spans"].tolist() if self.strict else None
+            next_spans = group["Next Word Span"].tolist() if self.strict else None
+            self.page_words.setdefault(filename, {})[page_number] = (
+                page_bboxes, y_order, page_bboxes[y_order, 1], " ".join(contents), *word_offsets(contents),
+                contents, spans, next_spans
+            )
         
         # Create results dataframe
         self.df_results = self.df_para.copy()
@@ -59,7 +524,7 @@ class PDFErrorAnnotator:
         
         Args:
             val: Value to evaluate
-            
+        
         Returns:
             Evaluated value or original value if evaluation fails
         """
@@ -78,7 +543,7 @@ class PDFErrorAnnotator:
         Args:
             bbox: Bounding box to check
             container: Container bounding box
-            
+        
         Returns:
             bool: True if bbox is within container
         """
@@ -95,7 +560,7 @@ class PDFErrorAnnotator:
         
         Args:
             error_phrases: Error phrases as string or list
-            
+        
         Returns:
             list: List of error phrases
         """
@@ -119,7 +584,7 @@ class PDFErrorAnnotator:
             filename (str): Name of the PDF file
             folder_path (str): Path to the folder containing PDF files
             output_folder (str): Path to save annotated PDFs
-            
+        
         Returns:
             bool: True if processing was successful
         """
@@ -131,15 +596,53 @@ class PDFErrorAnnotator:
             print(f"Error opening file {filename}: {e}")
             return False
         
-        df_para_file = self.df_para[self.df_para["Asset Name"] == filename]
+        in_file = (self.df_para[self.para_file_column] == filename).to_numpy()
+        df_para_file = self.df_para[in_file]
+        page_words = self.page_words.get(filename, {})
+        page_cache = {}  # page index -> page, None if out of range
+        
+        # Annotation bboxes of the file's paragraphs, stored in df_results in one assignment
+        annotation_bboxes_file = self.df_results.loc[df_para_file.index, "Annotation_bbox"].tolist()
         
-        # Process each paragraph in the file
-        for idx, para_row in df_para_file.iterrows():
-            self.process_paragraph(pdf_document, para_row, idx, filename)
+        # Read the needed columns once as plain lists
+        page_numbers = df_para_file["Page Number"].tolist()
+        error_lists = [self.parse_error_phrases(e) for e in df_para_file["error_phrase"].tolist()]
+        para_bboxes_file = self.para_bboxes[in_file]
+        has_bbox = ~np.isnan(para_bboxes_file).any(axis=1)
+        
+        # Height of each paragraph's page, NaN for skipped paragraphs. Only paragraphs
+        # with error phrases and a bbox load their page, and when paragraphs without
+        # words are never highlighted, pages without words are skipped too.
+        needs_words = self.strict or not self.highlight_empty_paragraphs
+        page_heights = np.full(len(page_numbers), np.nan)
+        for pos, page_number in enumerate(page_numbers):
+            if not error_lists[pos] or not has_bbox[pos] or (needs_words and page_number not in page_words):
+                continue
+            pdf_page = self.load_page(pdf_document, page_cache, page_number, filename)
+            if pdf_page is not None:
+                page_heights[pos] = pdf_page.rect.height
+        
+        # Convert adobe to fitz coordinates and add the buffer for all paragraphs at once
+        fitz_bboxes = para_bboxes_file * [1, -1, 1, -1] + page_heights[:, None] * [0, 1, 0, 1] + self.BUFFER_OFFSETS
+        
+        for pos in np.flatnonzero(~np.isnan(page_heights)).tolist():
+            page_number = page_numbers[pos]
+            annotation_bboxes_file[pos] = self.process_paragraph(
+                page_cache[page_number - 1], (filename, page_number), page_words.get(page_number),
+                fitz_bboxes[pos], error_lists[pos]
+            )
+        
+        self.df_results.loc[df_para_file.index, "Annotation_bbox"] = pd.Series(
+            annotation_bboxes_file, index=df_para_file.index, dtype=object
+        )
         
         try:
             annotated_pdf_path = os.path.join(output_folder, filename)
-            pdf_document.save(annotated_pdf_path)
+            # Drop unused objects and compress streams, including uncompressed images
+            # and fonts, which keeps large outputs small
+            pdf_document.save(
+                annotated_pdf_path, garbage=3, deflate=True, deflate_images=True, deflate_fonts=True, clean=True
+            )
             print(f"Annotated PDF saved: {annotated_pdf_path}")
             pdf_document.close()
             return True
@@ -148,76 +651,116 @@ class PDFErrorAnnotator:
             pdf_document.close()
             return False
     
-    def process_paragraph(self, pdf_document, para_row, idx, filename):
+    @staticmethod
+    def load_page(pdf_document, page_cache, page_number, filename):
         """
-        Process a single paragraph for error highlighting.
+        Load a page once per file.
         
         Args:
             pdf_document: PyMuPDF document object
-            para_row: DataFrame row containing paragraph data
-            idx: Index of the paragraph in the results DataFrame
+            page_cache (dict): Page index -> page, shared by the file's paragraphs
+            page_number (int): Page number to load
             filename: Name of the PDF file
+        
+        Returns:
+            PyMuPDF page object, None if the page is out of range
         """
-        page_index = para_row["Page Number"] - 1
-        para_bbox = para_row["Clipbounds"]
-        error_phrases = para_row["error_phrase"]
+        page_index = page_number - 1
+        if page_index not in page_cache:
+            try:
+                page_cache[page_index] = pdf_document[page_index]
+            except IndexError:
+                print(f"Page index {page_index} out of range for document {filename}")
+                page_cache[page_index] = None
+        return page_cache[page_index]
+    
+    def process_paragraph(self, pdf_page, page_key, words, para_bbox, error_list):
+        """
+        Process a single paragraph for error highlighting.
         
-        # Skip if no clipbounds or error phrases
-        if not para_bbox or pd.isna(error_phrases):
-            return
-            
+        Args:
+            pdf_page: PyMuPDF page object
+            page_key (tuple): (file name, page number) of the paragraph
+            words (tuple): (word bboxes, y order, sorted y, page text, word starts, word ends,
+                contents, spans, next word spans) of the paragraph's page, None if the page has no words
+            para_bbox: Buffered paragraph bounding box in fitz coordinates
+            error_list: List of error phrases
+        
+        Returns:
+            list: Annotation bboxes of the paragraph
+        """
         # Initialize empty annotation bboxes list for this paragraph
         annotation_bboxes = []
         
-        try:
-            pdf_page = pdf_document[page_index]
-        except IndexError:
-            print(f"Page index {page_index} out of range for document {filename}")
-            return
-            
-        page_height = pdf_page.rect.height
-        
-        # Convert adobe to fitz coordinate system
-        para_bbox = [
-            para_bbox[0],  
-            page_height - para_bbox[1],  
-            para_bbox[2],  
-            page_height - para_bbox[3]   
-        ]
+        # Get all words in this paragraph
+        if words is None:
+            in_para = np.empty(0, dtype=np.int64)
+        else:
+            page_bboxes, y_order, y_sorted, page_text, page_starts, page_ends = words[:6]
+            # Only words whose top lies in the paragraph's y range can be inside it
+            lo = np.searchsorted(y_sorted, para_bbox[1], side="left")
+            hi = np.searchsorted(y_sorted, para_bbox[3], side="right")
+            candidates = y_order[lo:hi]
+            # Back to page order, which the phrase matching relies on
+            in_para = np.sort(candidates[within_mask(page_bboxes[candidates], para_bbox)])
         
-        # Add buffer to paragraph Clipbounds
-        para_bbox = [
-            para_bbox[0] - self.BUFFER,
-            para_bbox[1] - self.BUFFER,
-            para_bbox[2] + self.BUFFER,
-            para_bbox[3] + self.BUFFER
-        ]
+        if len(in_para) == 0:
+            if not self.strict and self.highlight_empty_paragraphs:
+                # No words found within paragraph bbox, use paragraph bbox as a fallback
+                self.highlight_paragraph(pdf_page, para_bbox.tolist(), error_list, annotation_bboxes)
+        else:
+            # Process word matches
+            text, word_starts, word_ends = paragraph_text(page_text, page_starts, page_ends, in_para)
+            first_positions = self.paragraph_occurrences(
+                page_key, page_text, page_starts, page_ends, in_para, text, error_list
+            )
+            self.process_word_matches(
+                pdf_page, words, in_para, (word_starts, word_ends), first_positions, error_list,
+                para_bbox.tolist(), annotation_bboxes
+            )
         
-        # Parse error phrases
-        error_list = self.parse_error_phrases(error_phrases)
+        return annotation_bboxes
+    
+    def paragraph_occurrences(self, page_key, page_text, page_starts, page_ends, in_para, text, error_list):
+        """
+        Start of the first occurrence of each error phrase in a paragraph's text, -1 if absent.
         
-        if not error_list:
-            return
-            
-        # Get all words in this paragraph
-        matching_rows = self.df_words[
-            (self.df_words["File Name"] == filename) &
-            (self.df_words["Page Number"] == page_index + 1)
-        ]
+        A paragraph that is one run of its page's words looks each phrase up in the
+        occurrences cached for the page, so a phrase is only searched once per page.
         
-        matching_rows = matching_rows[
-            matching_rows["Clipbounds"].apply(lambda b: self.is_within(b, para_bbox))
-        ].reset_index(drop=True)
+        Args:
+            page_key (tuple): (file name, page number) of the paragraph
+            page_text (str): " ".join of all words on the page
+            page_starts: Start offset of each page word in page_text
+            page_ends: End offset of each page word in page_text
+            in_para: Sorted page indices of the paragraph's words
+            text (str): Paragraph text
+            error_list: List of error phrases
         
-        if matching_rows.empty:
-            # No words found within paragraph bbox, use paragraph bbox as a fallback
-            self.highlight_paragraph(pdf_page, para_bbox, error_list, annotation_bboxes)
-        else:
-            # Process word matches
-            self.process_word_matches(pdf_page, matching_rows, error_list, para_bbox, annotation_bboxes)
+        Returns:
+            dict: Error phrase -> start in text
+        """
+        first, last = in_para[0], in_para[-1]
+        if last - first + 1 != len(in_para):
+            return first_occurrences(text, error_list)
         
-        # Store annotation bboxes in results DataFrame
-        self.df_results.at[idx, "Annotation_bbox"] = annotation_bboxes
+        lo, hi = page_starts[first], page_ends[last]
+        positions = {}
+        for error in error_list:
+            if not error or not isinstance(error, str) or error in positions:
+                continue
+            key = (*page_key, error)
+            starts = self.phrase_cache.get(key)
+            if starts is None:
+                starts = self.phrase_cache[key] = phrase_starts(page_text, error)
+                if len(self.phrase_cache) > self.PHRASE_CACHE_SIZE:
+                    self.phrase_cache.popitem(last=False)
+            else:
+                self.phrase_cache.move_to_end(key)
+            # First occurrence starting in the paragraph, it is inside it if it also ends there
+            k = np.searchsorted(starts, lo, side="left")
+            positions[error] = int(starts[k] - lo) if k < len(starts) and starts[k] + len(error) <= hi else -1
+        return positions
     
     def highlight_paragraph(self, pdf_page, para_bbox, error_list, annotation_bboxes):
         """
@@ -236,111 +779,257 @@ class PDFErrorAnnotator:
         highlight.update()
         highlight.set_info({"content": f"Potential Errors: {', '.join(error_list)}"})
     
-    def process_word_matches(self, pdf_page, matching_rows, error_list, para_bbox, annotation_bboxes):
+    def process_word_matches(self, pdf_page, words, in_para, word_bounds, first_positions, error_list,
+                             para_bbox, annotation_bboxes):
         """
         Process word-level matches for error phrases.
         
         Args:
             pdf_page: PyMuPDF page object
-            matching_rows: DataFrame rows with matching words
+            words (tuple): Word index entry of the paragraph's page
+            in_para: Sorted page indices of the paragraph's words
+            word_bounds (tuple): Start and end of each word in the paragraph text
+            first_positions (dict): Error phrase -> start of its first occurrence in the text, -1 if absent
             error_list: List of error phrases
             para_bbox: Paragraph bounding box
             annotation_bboxes: List to store annotation bounding boxes
         """
-        # Create a continuous string of all words for exact matching
-        all_words_string = " ".join(matching_rows["Content"].astype(str))
+        page_bboxes = words[0]
+        bboxes = page_bboxes[in_para]
+        if self.strict:
+            # The paragraph's rows of the page's word columns
+            page_contents, page_spans, page_next_spans = words[6:]
+            indices = in_para.tolist()
+            self.annotate_strict(
+                pdf_page, [page_contents[i] for i in indices], [page_spans[i] for i in indices],
+                [page_next_spans[i] for i in indices], bboxes, word_bounds, first_positions, error_list,
+                annotation_bboxes
+            )
+        else:
+            self.annotate_with_fallback(
+                pdf_page, bboxes, word_bounds, first_positions, error_list, para_bbox, annotation_bboxes
+            )
+    
+    def annotate_with_fallback(self, pdf_page, bboxes, word_bounds, first_positions, error_list, para_bbox,
+                               annotation_bboxes):
+        """
+        Highlight exact matches of the error phrases, or the entire paragraph if none is found.
+        
+        Args:
+            pdf_page: PyMuPDF page object
+            bboxes: (N, 4) bounding boxes of the matching words
+            word_bounds (tuple): Start and end of each word in the paragraph text
+            first_positions (dict): Error phrase -> start of its first occurrence in the text, -1 if absent
+            error_list: List of error phrases
+            para_bbox: Paragraph bounding box
+            annotation_bboxes: List to store annotation bounding boxes
+        """
+        # Word offsets in the continuous string of all words
+        word_starts, word_ends = word_bounds
         
         matches_found = False
         
         for error in error_list:
             if not error or not isinstance(error, str):
                 continue
-                
+            
             # Try direct string matching
-            if error in all_words_string:
+            match_start = first_positions[error]
+            if match_start != -1:
                 matches_found = True
                 
                 # Find word indices that correspond to the exact match
-                match_start = all_words_string.find(error)
                 match_end = match_start + len(error)
                 
-                # Find word indices that make up this exact match
-                current_position = 0
-                match_word_indices = []
-                
-                for word_idx, word in enumerate(matching_rows["Content"]):
-                    word_str = str(word)
-                    word_start = current_position
-                    word_end = word_start + len(word_str)
-                    
-                    # Check if this word overlaps with the match
-                    if (word_start <= match_end) and (word_end >= match_start):
-                        match_word_indices.append(word_idx)
-                    
-                    current_position = word_end + 1  # +1 for space
+                # Find word indices that overlap this exact match
+                lo = np.searchsorted(word_ends, match_start, side="left")
+                hi = np.searchsorted(word_starts, match_end, side="right")
+                match_word_indices = list(range(lo, hi))
                 
                 # Get bounding boxes for the matched words
                 if match_word_indices:
-                    self.highlight_matched_words(
-                        pdf_page, matching_rows, match_word_indices, error, annotation_bboxes
-                    )
+                    self.highlight_matched_words(pdf_page, bboxes, match_word_indices, error, annotation_bboxes)
         
         # If no matches were found for any error phrase, highlight the entire paragraph
         if not matches_found:
             self.highlight_paragraph(pdf_page, para_bbox, error_list, annotation_bboxes)
     
-    def highlight_matched_words(self, pdf_page, matching_rows, match_word_indices, error, annotation_bboxes):
+    def annotate_strict(self, pdf_page, contents, spans, next_spans, bboxes, word_bounds, first_positions,
+                        error_list, annotation_bboxes):
+        """
+        Highlight exact matches of the error phrases, falling back to the best
+        partial run of words within one span chain.
+        
+        Each word is highlighted for at most one error phrase.
+        
+        Args:
+            pdf_page: PyMuPDF page object
+            contents (list): Text of the paragraph's words
+            spans (list): Span of each word
+            next_spans (list): Span of the word following each word
+            bboxes: (N, 4) bounding boxes of the matching words
+            word_bounds (tuple): Start and end of each word in the paragraph text
+            first_positions (dict): Error phrase -> start of its first occurrence in the text, -1 if absent
+            error_list: List of error phrases
+            annotation_bboxes: List to store annotation bounding boxes
+        """
+        # Word offsets in the continuous string of all words
+        word_starts, word_ends = word_bounds
+        
+        # Words with spaces removed, shared by every partial match attempt
+        contents_nospace = [c.replace(" ", "") for c in contents]
+        
+        if partial_runs_kernel is not None:
+            # Space-stripped words as one UTF-8 buffer for the compiled partial matcher
+            word_bytes = [c.encode() for c in contents_nospace]
+            word_buf = np.frombuffer(b"".join(word_bytes), dtype=np.uint8)
+            byte_offsets = np.zeros(len(word_bytes) + 1, dtype=np.int64)
+            np.cumsum([len(b) for b in word_bytes], out=byte_offsets[1:])
+            span_breaks = np.array([False] + [next_spans[j - 1] != spans[j] for j in range(1, len(spans))])
+        
+        # Track used indices to prevent duplicate highlights
+        used_indices = set()
+        
+        for error in error_list:
+            if not error or not isinstance(error, str):
+                continue
+            
+            # First, try direct string matching
+            match_start = first_positions[error]
+            
+            if match_start != -1:
+                # For the first direct match, find the corresponding words and highlight.
+                # Capture words even if they only partially overlap the exact phrase
+                lo = np.searchsorted(word_ends, match_start, side="left")
+                hi = np.searchsorted(word_starts, match_start + len(error), side="left")
+                match_word_indices = [i for i in range(lo, hi) if i not in used_indices]
+                
+                # Highlight the matched words
+                if match_word_indices:
+                    self.highlight_matched_words(pdf_page, bboxes, match_word_indices, error, annotation_bboxes)
+                    
+                    # Mark these indices as used
+                    used_indices.update(match_word_indices)
+                    continue
+            
+            # Partial matching logic
+            all_matches = []
+            if partial_runs_kernel is not None:
+                used_mask = np.zeros(len(contents), dtype=np.bool_)
+                used_mask[list(used_indices)] = True
+            
+            error_tokens = error.split()
+            found_full = False
+            for start in range(len(error_tokens)):
+                sub_error = " ".join(error_tokens[start:])
+                clean_error = sub_error.replace(" ", "")
+                
+                if partial_runs_kernel is not None:
+                    target = np.frombuffer(clean_error.encode(), dtype=np.uint8)
+                    run_starts, run_ends = partial_runs_kernel(word_buf, byte_offsets, span_breaks, used_mask, target)
+                    runs = [list(range(a, b)) for a, b in zip(run_starts.tolist(), run_ends.tolist())]
+                else:
+                    runs = find_partial_runs(contents_nospace, spans, next_spans, clean_error, used_indices)
+                
+                for temp_sequence in runs:
+                    match_text = "".join([contents[x] for x in temp_sequence])
+                    match_clean = "".join([contents_nospace[x] for x in temp_sequence])
+                    all_matches.append({
+                        "sequence": temp_sequence,
+                        "text": match_text,
+                        "is_full_match": match_clean == clean_error,
+                        "length": len(match_clean),
+                        "sub_error": sub_error,
+                        "original_error": error
+                    })
+                    
+                    # The first full match is the one highlighted, later suffixes can't beat it
+                    if match_clean == clean_error:
+                        found_full = True
+                        break
+                
+                if found_full:
+                    break
+            
+            # Prefer full matches first
+            full_matches = [m for m in all_matches if m["is_full_match"]]
+            if full_matches:
+                # If full matches exist, highlight only the first full match
+                match_to_highlight = full_matches[0]
+            else:
+                # If no full matches, find the longest partial match
+                if not all_matches:
+                    continue
+                
+                # Find the maximum length of partial matches
+                max_len = max(m["length"] for m in all_matches)
+                
+                # Select only the first match with the maximum length
+                match_to_highlight = next(m for m in all_matches if m["length"] == max_len)
+            
+            # Check if the match uses any already used indices
+            if not any(idx in used_indices for idx in match_to_highlight["sequence"]):
+                self.highlight_matched_words(
+                    pdf_page, bboxes, match_to_highlight["sequence"],
+                    match_to_highlight["original_error"], annotation_bboxes
+                )
+                
+                # Mark these indices as used
+                used_indices.update(match_to_highlight["sequence"])
+    
+    def highlight_matched_words(self, pdf_page, bboxes, match_word_indices, error, annotation_bboxes):
         """
         Highlight matched words on the PDF page.
         
         Args:
             pdf_page: PyMuPDF page object
-            matching_rows: DataFrame rows with matching words
+            bboxes: (N, 4) bounding boxes of the paragraph's words
             match_word_indices: Indices of matching words
             error: Error phrase being highlighted
             annotation_bboxes: List to store annotation bounding boxes
         """
-        phrase_bboxes = matching_rows.loc[match_word_indices, "Clipbounds"].tolist()
-        
-        # Group bounding boxes by line
-        phrase_bboxes.sort(key=lambda b: b[1])  # Sort by y-coordinate
+        phrase_bboxes = bboxes[match_word_indices]
         
         # Group words by line based on vertical position
-        line_groups = [[phrase_bboxes[0]]]
-        for k in range(1, len(phrase_bboxes)):
-            if abs(phrase_bboxes[k][1] - phrase_bboxes[k-1][1]) <= self.LINE_TOLERANCE:
-                # Same line
-                line_groups[-1].append(phrase_bboxes[k])
-            else:
-                # New line
-                line_groups.append([phrase_bboxes[k]])
-        
-        # Highlight each line separately
-        for line in line_groups:
-            x0 = min(b[0] for b in line)
-            y0 = min(b[1] for b in line)
-            x1 = max(b[2] for b in line)
-            y1 = max(b[3] for b in line)
-            
-            line_bbox = [x0, y0, x1, y1]
-            annotation_bboxes.append(line_bbox)
-            
-            phrase_rect = fitz.Rect(x0, y0, x1, y1)
-            highlight = pdf_page.add_highlight_annot(phrase_rect)
-            highlight.set_colors(stroke=self.EXACT_MATCH_COLOR)
-            highlight.update()
-            highlight.set_info({"content": f"Error Phrase: {error}"})
+        line_bboxes = line_rects(phrase_bboxes, self.LINE_TOLERANCE)
+        annotation_bboxes.extend(line_bboxes)
+        
+        # One highlight per error phrase, with a quad for each line, so the
+        # appearance stream is built once per phrase instead of per line
+        quads = [fitz.Rect(*line_bbox).quad for line_bbox in line_bboxes]
+        highlight = pdf_page.add_highlight_annot(quads)
+        highlight.set_colors(stroke=self.EXACT_MATCH_COLOR)
+        highlight.update()
+        highlight.set_info({"content": f"Error Phrase: {error}"})
     
     def save_results(self, output_file):
         """
-        Save annotation results to Excel file.
+        Save annotation results to a Parquet or Excel file.
+        
+        Parquet is written when output_file ends in .parquet, which is much faster
+        than Excel and stores the bbox lists natively. Without pyarrow, or when the
+        frame can't be stored as Parquet, the results go to an Excel file of the same
+        name instead.
         
         Args:
-            output_file (str): Path to save results Excel file
-            
+            output_file (str): Path to save results, .parquet or Excel
+        
         Returns:
             bool: True if saving was successful
         """
+        if output_file.endswith(".parquet"):
+            if pyarrow is not None:
+                try:
+                    self.df_results.to_parquet(output_file, engine="pyarrow", compression="zstd", index=False)
+                    print(f"Annotation results saved to {output_file}")
+                    return True
+                except Exception as e:
+                    print(f"Error saving annotation results as Parquet: {e}")
+            else:
+                print("pyarrow is not installed")
+            output_file = os.path.splitext(output_file)[0] + ".xlsx"
+            print("Saving annotation results as Excel instead")
+        
         try:
             self.df_results.to_excel(output_file, index=False)
             print(f"Annotation results saved to {output_file}")
@@ -357,7 +1046,7 @@ class PDFErrorAnnotator:
             DataFrame: Rows with error phrases but no annotations
         """
         empty_annotations = self.df_results[
-            (self.df_results["error_phrase"].notna()) & 
+            (self.df_results["error_phrase"].notna()) &
             (self.df_results["Annotation_bbox"].apply(lambda x: len(x) == 0))
         ]
         
@@ -366,14 +1055,52 @@ class PDFErrorAnnotator:
         
         return empty_annotations
     
-    def process_all_files(self, folder_path, output_folder):
+    def file_subset(self, filename):
+        """
+        Create an annotator holding only the rows of a single file.
+        
+        Args:
+            filename (str): Name of the PDF file
+        
+        Returns:
+            PDFErrorAnnotator: Annotator with the file's paragraph, word and result rows
+        """
+        subset = PDFErrorAnnotator(
+            buffer=self.BUFFER, line_tolerance=self.LINE_TOLERANCE, bbox_column=self.bbox_column,
+            para_file_column=self.para_file_column, strict=self.strict,
+            highlight_empty_paragraphs=self.highlight_empty_paragraphs
+        )
+        in_file = (self.df_para[self.para_file_column] == filename).to_numpy()
+        subset.df_para = self.df_para[in_file]
+        subset.para_bboxes = self.para_bboxes[in_file]
+        # The page index already holds the file's word rows
+        subset.page_words = {filename: self.page_words.get(filename, {})}
+        subset.df_results = self.df_results[in_file].copy()
+        return subset
+    
+    def process_all_files(self, folder_path, output_folder, max_workers=None):
         """
         Process all PDF files in the dataset.
         
+        Files are independent, so each one is annotated in a worker process
+        that only receives that file's rows.
+        
         Args:
             folder_path (str): Path to the folder containing PDF files
             output_folder (str): Path to save annotated PDFs
+            max_workers (int): Number of worker processes, defaults to the CPU count
+                but never more than the number of files
         """
-        # Process each unique file
-        for filename in self.df_para["Asset Name"].unique():
-            self.process_file(filename, folder_path, output_folder)
+        filenames = self.df_para[self.para_file_column].unique()
+        if max_workers is None:
+            max_workers = max(1, min(os.cpu_count() or 1, len(filenames)))
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                _annotate_file, [self.file_subset(filename) for filename in filenames],
+                filenames, repeat(folder_path), repeat(output_folder)
+            )
+            
+            # Merge each file's annotation bboxes back into the results
+            for annotation_bboxes_file in results:
+                self.df_results.loc[annotation_bboxes_file.index, "Annotation_bbox"] = annotation_bboxes_file